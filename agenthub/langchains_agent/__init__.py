@@ -1,4 +1,5 @@
-from typing import List, Dict, Type
+import threading
+from typing import Any, Callable, List, Dict, Optional, Tuple, Type
 
 import agenthub.langchains_agent.utils.llm as llm
 from opendevin.agent import Agent
@@ -12,6 +13,7 @@ from opendevin.action import (
     AgentRecallAction,
     AgentThinkAction,
     AgentFinishAction,
+    ACTION_TYPE_TO_CLASS,
 )
 from opendevin.observation import (
     Observation,
@@ -63,116 +65,132 @@ INITIAL_THOUGHTS = [
 ]
 
 
+# Thought prefix -> (action, arg_key) for thoughts that are actions
+_THOUGHT_PREFIXES: Dict[str, Tuple[str, str]] = {
+    "RUN": ("run", "command"),
+    "RECALL": ("recall", "query"),
+    "BROWSE": ("browse", "url"),
+}
+
+
+def _parse_thoughts(thoughts: List[str]) -> List[Tuple[str, str, str, bool]]:
+    parsed = []
+    next_is_output = False
+    for thought in thoughts:
+        head, _, rest = thought.partition(" ")
+        if next_is_output:
+            entry = ("output", "output", thought)
+            next_is_output = False
+        elif head in _THOUGHT_PREFIXES:
+            entry = _THOUGHT_PREFIXES[head] + (rest,)
+            next_is_output = True
+        else:
+            entry = ("think", "thought", thought)
+        parsed.append(entry + ("$TASK" in entry[2],))
+    return parsed
+
+
+# Parsed once at import; each entry is (action, arg_key, template, needs_task)
+_PARSED_THOUGHTS = _parse_thoughts(INITIAL_THOUGHTS)
+
+
 MAX_OUTPUT_LENGTH = 5000
 MAX_MONOLOGUE_LENGTH = 20000
 
 
-ACTION_TYPE_TO_CLASS: Dict[str, Type[Action]] = {
-    "run": CmdRunAction,
-    "kill": CmdKillAction,
-    "browse": BrowseURLAction,
-    "read": FileReadAction,
-    "write": FileWriteAction,
-    "recall": AgentRecallAction,
-    "think": AgentThinkAction,
-    "finish": AgentFinishAction,
+def _observation_output(obs: Observation) -> dict:
+    return {"action": "output", "args": {"output": obs.content}}
+
+
+def _cmd_output(obs: CmdOutputObservation) -> dict:
+    return {"action": "error" if obs.error else "output", "args": {"output": obs.content}}
+
+
+# Observation types not listed here fall back to _observation_output
+_OBSERVATION_BUILDERS: Dict[Type[Observation], Callable[[Any], dict]] = {
+    CmdOutputObservation: _cmd_output,
+    BrowserOutputObservation: _observation_output,
 }
 
-CLASS_TO_ACTION_TYPE: Dict[Type[Action], str] = {v: k for k, v in ACTION_TYPE_TO_CLASS.items()}
+_ACTION_BUILDERS: Dict[Type[Action], Callable[[Any], dict]] = {
+    CmdRunAction: lambda a: {"action": "run", "args": {"command": a.command}},
+    CmdKillAction: lambda a: {"action": "kill", "args": {"id": a.id}},
+    BrowseURLAction: lambda a: {"action": "browse", "args": {"url": a.url}},
+    FileReadAction: lambda a: {"action": "read", "args": {"file": a.path}},
+    FileWriteAction: lambda a: {"action": "write", "args": {"file": a.path, "content": a.contents}},
+    AgentRecallAction: lambda a: {"action": "recall", "args": {"query": a.query}},
+    AgentThinkAction: lambda a: {"action": "think", "args": {"thought": a.thought}},
+    AgentFinishAction: lambda a: {"action": "finish"},
+}
 
 class LangchainsAgent(Agent):
     _initialized = False
+    # Task-independent initial thoughts, embedded once and shared by every agent
+    _base_memory: Optional[LongTermMemory] = None
+    _base_memory_lock = threading.Lock()
 
     def __init__(self, model_name: str):
         super().__init__(model_name)
         self.monologue = Monologue(self.model_name)
         self.memory = LongTermMemory()
+        self._init_lock = threading.Lock()
+
+    @classmethod
+    def _get_base_memory(cls) -> LongTermMemory:
+        with cls._base_memory_lock:
+            if cls._base_memory is None:
+                cls._base_memory = LongTermMemory.prebuilt([
+                    {"action": action, "args": {arg_key: template}}
+                    for action, arg_key, template, needs_task in _PARSED_THOUGHTS
+                    if not needs_task
+                ])
+            return cls._base_memory
+
+    def _add_event(self, event: dict, remember: bool = True):
+        output = event['args'].get('output')
+        if output is not None and len(output) > MAX_OUTPUT_LENGTH:
+            event['args']['output'] = f"{output[:MAX_OUTPUT_LENGTH]}..."
+
+        self.monologue.add_event(llm.compress_event(event))
+        if remember:
+            self.memory.add_event(event)
+        if self.monologue.get_total_length() > MAX_MONOLOGUE_LENGTH:
+            self.monologue.condense(MAX_MONOLOGUE_LENGTH // 2)
 
-    def _add_event(self, event: dict):
-        if 'output' in event['args'] and len(event['args']['output']) > MAX_OUTPUT_LENGTH:
-            event['args']['output'] = event['args']['output'][:MAX_OUTPUT_LENGTH] + "..."
+    def initialize(self):
+        # May run on an executor thread while step() is called from the event loop
+        with self._init_lock:
+            if self._initialized:
+                return
 
-        self.monologue.add_event(event)
-        self.memory.add_event(event)
-        if self.monologue.get_total_length() > MAX_MONOLOGUE_LENGTH:
-            self.monologue.condense()
-
-    def _initialize(self):
-        if self._initialized:
-            return
-
-        if self.instruction is None or self.instruction == "":
-            raise ValueError("Instruction must be provided")
-
-        next_is_output = False
-        for thought in INITIAL_THOUGHTS:
-            thought = thought.replace("$TASK", self.instruction)
-            if next_is_output:
-                d = {"action": "output", "args": {"output": thought}}
-                next_is_output = False
-            else:
-                if thought.startswith("RUN"):
-                    command = thought.split("RUN ")[1]
-                    d = {"action": "run", "args": {"command": command}}
-                    next_is_output = True
-
-                elif thought.startswith("RECALL"):
-                    query = thought.split("RECALL ")[1]
-                    d = {"action": "recall", "args": {"query": query}}
-                    next_is_output = True
-
-                elif thought.startswith("BROWSE"):
-                    url = thought.split("BROWSE ")[1]
-                    d = {"action": "browse", "args": {"url": url}}
-                    next_is_output = True
-                else:
-                    d = {"action": "think", "args": {"thought": thought}}
-
-        self._add_event(d)
-        self._initialized = True
+            if self.instruction is None or self.instruction == "":
+                raise ValueError("Instruction must be provided")
+
+            # only the thoughts mentioning the task go into this agent's own memory
+            self.memory.base = self._get_base_memory()
+            for action, arg_key, template, needs_task in _PARSED_THOUGHTS:
+                value = template.replace("$TASK", self.instruction) if needs_task else template
+                self._add_event({"action": action, "args": {arg_key: value}}, remember=needs_task)
+            self._initialized = True
 
     def step(self, state: State) -> Action:
-        self._initialize()
+        self.initialize()
         # TODO: make langchains agent use Action & Observation
         # completly from ground up
 
         # Translate state to action_dict
         for prev_action, obs in state.updated_info:
-            if isinstance(obs, CmdOutputObservation):
-                if obs.error:
-                    d = {"action": "error", "args": {"output": obs.content}}
-                else:
-                    d = {"action": "output", "args": {"output": obs.content}}
-            # elif isinstance(obs, UserMessageObservation):
-            #     d = {"action": "output", "args": {"output": obs.message}}
-            # elif isinstance(obs, AgentMessageObservation):
-            #     d = {"action": "output", "args": {"output": obs.message}}
-            elif isinstance(obs, (BrowserOutputObservation, Observation)):
-                d = {"action": "output", "args": {"output": obs.content}}
-            else:
-                raise NotImplementedError(f"Unknown observation type: {obs}")
-            self._add_event(d)
-
-
-            if isinstance(prev_action, CmdRunAction):
-                d = {"action": "run", "args": {"command": prev_action.command}}
-            elif isinstance(prev_action, CmdKillAction):
-                d = {"action": "kill", "args": {"id": prev_action.id}}
-            elif isinstance(prev_action, BrowseURLAction):
-                d = {"action": "browse", "args": {"url": prev_action.url}}
-            elif isinstance(prev_action, FileReadAction):
-                d = {"action": "read", "args": {"file": prev_action.path}}
-            elif isinstance(prev_action, FileWriteAction):
-                d = {"action": "write", "args": {"file": prev_action.path, "content": prev_action.contents}}
-            elif isinstance(prev_action, AgentRecallAction):
-                d = {"action": "recall", "args": {"query": prev_action.query}}
-            elif isinstance(prev_action, AgentThinkAction):
-                d = {"action": "think", "args": {"thought": prev_action.thought}}
-            elif isinstance(prev_action, AgentFinishAction):
-                d = {"action": "finish"}
-            else:
+            obs_builder = _OBSERVATION_BUILDERS.get(type(obs))
+            if obs_builder is None:
+                if not isinstance(obs, Observation):
+                    raise NotImplementedError(f"Unknown observation type: {obs}")
+                obs_builder = _observation_output
+            self._add_event(obs_builder(obs))
+
+            action_builder = _ACTION_BUILDERS.get(type(prev_action))
+            if action_builder is None:
                 raise NotImplementedError(f"Unknown action type: {prev_action}")
-            self._add_event(d)
+            self._add_event(action_builder(prev_action))
 
         state.updated_info = []
             
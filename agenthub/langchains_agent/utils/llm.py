@@ -19,6 +19,13 @@ from langchain.prompts import PromptTemplate
 from langchain_core.output_parsers import JsonOutputParser
 from langchain_openai import ChatOpenAI
 
+# Set to an LLMLingua-2 model (e.g. microsoft/llmlingua-2-xlm-roberta-large-meetingbank)
+# to compress long command outputs before they enter the monologue.
+LLMLINGUA_MODEL = os.getenv("LLMLINGUA_MODEL")
+LLMLINGUA_DEVICE = os.getenv("LLMLINGUA_DEVICE", "cpu")
+COMPRESSION_RATE = 0.33
+MIN_COMPRESS_LENGTH = 1000
+
 ACTION_PROMPT = """
 You're a thoughtful robot. Your main task is to {task}.
 Don't expand the scope of your task--just complete it as written.
@@ -113,6 +120,42 @@ def get_chain(template, model_name):
     return llm_chain
 
 
+_compressor = None
+_compressor_failed = False
+
+
+def get_compressor():
+    global _compressor, _compressor_failed
+    if _compressor is None and LLMLINGUA_MODEL and not _compressor_failed:
+        try:
+            from llmlingua import PromptCompressor
+
+            _compressor = PromptCompressor(
+                model_name=LLMLINGUA_MODEL, device_map=LLMLINGUA_DEVICE, use_llmlingua2=True
+            )
+        except Exception as e:
+            # compression is optional; don't retry loading the model on every event
+            print(f"Error loading LLMLingua compressor, compression disabled: {e}")
+            _compressor_failed = True
+    return _compressor
+
+
+def compress_event(event: dict) -> dict:
+    """Returns a copy of the event with a long `output` compressed by LLMLingua, if enabled."""
+    output = event.get("args", {}).get("output")
+    if output is None or len(output) < MIN_COMPRESS_LENGTH:
+        return event
+    compressor = get_compressor()
+    if compressor is None:
+        return event
+    try:
+        resp = compressor.compress_prompt(output, rate=COMPRESSION_RATE, force_tokens=["\n"])
+    except Exception as e:
+        print(f"Error compressing output, keeping it uncompressed: {e}")
+        return event
+    return {**event, "args": {**event["args"], "output": resp["compressed_prompt"]}}
+
+
 def summarize_monologue(thoughts: List[dict], model_name):
     llm_chain = get_chain(MONOLOGUE_SUMMARY_PROMPT, model_name)
     parser = JsonOutputParser(pydantic_object=NewMonologue)
@@ -1,38 +1,90 @@
+from typing import List, Optional
+
+import numpy as np
+
 from . import json
 
-import chromadb
+from llama_index.core import Settings
+
+# Number of buffered events that triggers an embedding pass
+EMBED_BATCH_SIZE = 32
+# Initial number of embedding rows; the buffer doubles whenever it fills up
+INITIAL_CAPACITY = 256
 
-from llama_index.core import Document
-from llama_index.core.retrievers import VectorIndexRetriever
-from llama_index.core import VectorStoreIndex
-from llama_index.vector_stores.chroma import ChromaVectorStore
+def _normalize(vectors: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(vectors, axis=-1, keepdims=True)
+    return vectors / np.maximum(norms, np.finfo(np.float32).tiny)
 
 class LongTermMemory:
-    def __init__(self):
-        db = chromadb.Client()
-        self.collection = db.get_or_create_collection(name="memories")
-        vector_store = ChromaVectorStore(chroma_collection=self.collection)
-        self.index = VectorStoreIndex.from_vector_store(vector_store)
-        self.thought_idx = 0
+    """
+    Exact nearest-neighbour memory over the events seen by the agent.
+    Embeddings are L2-normalized and kept in one contiguous float32 array,
+    so a search is a single matrix-vector product.
+
+    An optional, read-only `base` memory is searched together with this one,
+    so that memories shared by every agent only need to be embedded once.
+    """
+
+    def __init__(self, base: Optional["LongTermMemory"] = None):
+        self.base = base
+        self.texts: List[str] = []
+        self._embeddings: Optional[np.ndarray] = None
+        self._size = 0
+        self._pending: List[str] = []
+
+    @classmethod
+    def prebuilt(cls, events: List[dict]) -> "LongTermMemory":
+        memory = cls()
+        for event in events:
+            memory.add_event(event)
+        memory._flush()
+        return memory
 
     def add_event(self, event):
-        doc = Document(
-            text=json.dumps(event),
-            doc_id=str(self.thought_idx),
-            extra_info={
-                "type": event["action"],
-                "idx": self.thought_idx,
-            },
-        )
-        self.thought_idx += 1
-        self.index.insert(doc)
+        self._pending.append(json.dumps(event))
+        if len(self._pending) >= EMBED_BATCH_SIZE:
+            self._flush()
+
+    def _flush(self):
+        if not self._pending:
+            return
+        texts = self._pending
+        # one call to the embedding model for the whole batch
+        vectors = np.asarray(Settings.embed_model.get_text_embedding_batch(texts), dtype=np.float32)
+        self._append(_normalize(vectors))
+        self.texts.extend(texts)
+        # only drop the buffer once the batch is stored, so a failed call is retried
+        self._pending = []
+
+    def _append(self, vectors: np.ndarray):
+        needed = self._size + len(vectors)
+        if self._embeddings is None:
+            self._embeddings = np.empty((max(INITIAL_CAPACITY, needed), vectors.shape[1]), dtype=np.float32)
+        elif needed > len(self._embeddings):
+            grown = np.empty((max(2 * len(self._embeddings), needed), vectors.shape[1]), dtype=np.float32)
+            grown[:self._size] = self._embeddings[:self._size]
+            self._embeddings = grown
+        self._embeddings[self._size:needed] = vectors
+        self._size = needed
+
+    def _scores(self, q: np.ndarray) -> np.ndarray:
+        if self._embeddings is None or self._size == 0:
+            return np.empty(0, dtype=np.float32)
+        return self._embeddings[:self._size] @ q
 
     def search(self, query, k=10):
-        retriever = VectorIndexRetriever(
-            index=self.index,
-            similarity_top_k=k,
-        )
-        results = retriever.retrieve(query)
-        return [r.get_text() for r in results]
+        self._flush()
+        texts = self.texts if self.base is None else self.texts + self.base.texts
+        if not texts:
+            return []
+        q = _normalize(np.asarray(Settings.embed_model.get_query_embedding(query), dtype=np.float32))
+        scores = self._scores(q)
+        if self.base is not None:
+            scores = np.concatenate([scores, self.base._scores(q)])
+        k = min(k, len(texts))
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top])]
+        return [texts[i] for i in top]
+
 
 
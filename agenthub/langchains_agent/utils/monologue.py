@@ -1,36 +1,78 @@
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import List, Optional
 
 import agenthub.langchains_agent.utils.json as json
 import agenthub.langchains_agent.utils.llm as llm
 
+_condense_executor = ThreadPoolExecutor(thread_name_prefix="monologue-condense")
+
 class Monologue:
     def __init__(self, model_name):
         self.thoughts = []
         self.model_name = model_name
+        self._lengths: List[int] = []
+        self._total_length = 0
+        self._pending_condense: Optional[Future] = None
+        self._condense_split = 0
 
     def add_event(self, t: dict):
         if not isinstance(t, dict):
             raise ValueError("Event must be a dictionary")
+        self._merge_condensed()
+        length = self._get_length(t)
         self.thoughts.append(t)
+        self._lengths.append(length)
+        self._total_length += length
 
     def get_thoughts(self):
+        self._merge_condensed()
         return self.thoughts
 
     def get_total_length(self):
-        total_length = 0
-        for t in self.thoughts:
-            try:
-                total_length += len(json.dumps(t))
-            except TypeError as e:
-                print(f"Error serializing thought: {e}")
-        return total_length
-
-    def condense(self):
+        return self._total_length
+
+    def _get_length(self, t: dict) -> int:
+        try:
+            return len(json.dumps(t))
+        except TypeError as e:
+            print(f"Error serializing thought: {e}")
+            return 0
+
+    def condense(self, keep_length: int):
+        """
+        Starts summarizing older thoughts in the background. The newest thoughts
+        that fit in `keep_length` are kept verbatim; everything older (at least one
+        thought) is replaced by the summary once it is ready. Thoughts added in
+        the meantime are kept as they are.
+        """
+        if self._pending_condense is not None or not self.thoughts:
+            return
+        split = len(self.thoughts)
+        kept = 0
+        while split > 1 and kept + self._lengths[split - 1] <= keep_length:
+            split -= 1
+            kept += self._lengths[split]
+        self._condense_split = split
+        self._pending_condense = _condense_executor.submit(
+            llm.summarize_monologue, self.thoughts[:split], self.model_name
+        )
+
+    def _merge_condensed(self):
+        future = self._pending_condense
+        if future is None or not future.done():
+            return
+        self._pending_condense = None
+        split = self._condense_split
         try:
-            new_thoughts = llm.summarize_monologue(self.thoughts, self.model_name)
+            new_thoughts = future.result()
             # Ensure new_thoughts is not empty or significantly malformed before assigning
-            if not new_thoughts or len(new_thoughts) > len(self.thoughts):
+            if not new_thoughts or len(new_thoughts) > split:
                 raise ValueError("Condensing resulted in invalid state.")
-            self.thoughts = new_thoughts
         except Exception as e:
-            # Consider logging the error here instead of or in addition to raising an exception
-            raise RuntimeError(f"Error condensing thoughts: {e}")
+            # keep the un-condensed thoughts; the next condense() will try again
+            print(f"Error condensing thoughts: {e}")
+            return
+        new_lengths = [self._get_length(t) for t in new_thoughts]
+        self.thoughts = new_thoughts + self.thoughts[split:]
+        self._lengths = new_lengths + self._lengths[split:]
+        self._total_length = sum(self._lengths)
@@ -3,6 +3,7 @@ from .bash import CmdRunAction, CmdKillAction
 from .browse import BrowseURLAction
 from .fileop import FileReadAction, FileWriteAction
 from .agent import AgentRecallAction, AgentThinkAction, AgentFinishAction, AgentEchoAction
+from .registry import ACTION_TYPE_TO_CLASS, CLASS_TO_ACTION_TYPE
 
 __all__ = [
     "Action",
@@ -16,4 +17,6 @@ __all__ = [
     "AgentThinkAction",
     "AgentFinishAction",
     "AgentEchoAction",
+    "ACTION_TYPE_TO_CLASS",
+    "CLASS_TO_ACTION_TYPE",
 ]
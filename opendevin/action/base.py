@@ -2,6 +2,8 @@ from dataclasses import dataclass
 
 from typing import TYPE_CHECKING
 
+from opendevin.serialization import event_to_dict
+
 if TYPE_CHECKING:
     from opendevin.controller import AgentController
     from opendevin.observation import Observation
@@ -12,7 +14,7 @@ class Action:
         raise NotImplementedError
 
     def to_dict(self):
-        return {"action": self.__class__.__name__, "args": self.__dict__, "message": self.message}
+        return event_to_dict(self, "action", "args")
 
     @property
     def executable(self) -> bool:
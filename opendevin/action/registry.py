@@ -0,0 +1,22 @@
+from typing import Dict, Type
+
+from .base import Action
+from .bash import CmdRunAction, CmdKillAction
+from .browse import BrowseURLAction
+from .fileop import FileReadAction, FileWriteAction
+from .agent import AgentRecallAction, AgentThinkAction, AgentFinishAction
+
+# NOTE: this is a temporary solution - but hopefully we can use Action/Observation throughout the codebase
+ACTION_TYPE_TO_CLASS: Dict[str, Type[Action]] = {
+    "run": CmdRunAction,
+    "kill": CmdKillAction,
+    "browse": BrowseURLAction,
+    "read": FileReadAction,
+    "write": FileWriteAction,
+    "recall": AgentRecallAction,
+    "think": AgentThinkAction,
+    "finish": AgentFinishAction,
+}
+
+CLASS_TO_ACTION_TYPE: Dict[Type[Action], str] = {v: k for k, v in ACTION_TYPE_TO_CLASS.items()}
+
@@ -34,6 +34,14 @@ class Agent(ABC):
         """
         return self._complete
 
+    def initialize(self) -> None:
+        """
+        Prepares the agent for the current instruction before its first step.
+        The controller runs this in a worker thread so that slow setup does not
+        block the event loop. Agents that need no setup can rely on this no-op.
+        """
+        pass
+
     @abstractmethod
     def step(self, state: "State") -> "Action":
         """
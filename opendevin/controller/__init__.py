@@ -49,6 +49,7 @@ class AgentController:
     async def start_loop(self, task_instruction: str):
         try:
             self.agent.instruction = task_instruction
+            await asyncio.get_running_loop().run_in_executor(None, self.agent.initialize)
             for i in range(self.max_iterations):
                 print("STEP", i, flush=True)
 
@@ -1,7 +1,8 @@
-import copy
 from typing import List
 from dataclasses import dataclass
 
+from opendevin.serialization import event_to_dict
+
 
 @dataclass
 class Observation:
@@ -16,14 +17,7 @@ class Observation:
 
     def to_dict(self) -> dict:
         """Converts the observation to a dictionary."""
-        extras = copy.deepcopy(self.__dict__)
-        extras.pop("content", None)
-        return {
-            "observation": self.__class__.__name__,
-            "content": self.content,
-            "extras": extras,
-            "message": self.message,
-        }
+        return event_to_dict(self, "observation", "extras", top_level=("content",))
 
     @property
     def message(self) -> str:
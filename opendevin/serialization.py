@@ -0,0 +1,41 @@
+import copy
+import dataclasses
+from typing import Any, Callable, Dict, Tuple
+
+# Field types whose values can be shared instead of deep-copied
+_IMMUTABLE_TYPES = (str, int, float, bool)
+
+_builders: Dict[type, Callable[[Any], dict]] = {}
+
+
+def _compile_builder(cls: type, kind: str, fields_key: str, top_level: Tuple[str, ...]) -> Callable[[Any], dict]:
+    def expr(field: dataclasses.Field) -> str:
+        if field.type in _IMMUTABLE_TYPES:
+            return f"self.{field.name}"
+        return f"_deepcopy(self.{field.name})"
+
+    fields = dataclasses.fields(cls)
+    head = "".join(f"{f.name!r}: {expr(f)}, " for f in fields if f.name in top_level)
+    nested = ", ".join(f"{f.name!r}: {expr(f)}" for f in fields if f.name not in top_level)
+    src = (
+        "def to_dict(self):\n"
+        f"    return {{{kind!r}: {cls.__name__!r}, {head}{fields_key!r}: {{{nested}}}, 'message': self.message}}\n"
+    )
+    namespace: Dict[str, Any] = {"_deepcopy": copy.deepcopy}
+    exec(src, namespace)
+    return namespace["to_dict"]
+
+
+def event_to_dict(obj: Any, kind: str, fields_key: str, top_level: Tuple[str, ...] = ()) -> dict:
+    """
+    Converts a dataclass event to a dictionary of the form
+    `{kind: <class name>, <top_level fields>, fields_key: {<other fields>}, "message": obj.message}`.
+
+    The conversion function is generated once per class, on first use, from
+    `dataclasses.fields`, so later calls read each field directly.
+    """
+    cls = type(obj)
+    builder = _builders.get(cls)
+    if builder is None:
+        builder = _builders[cls] = _compile_builder(cls, kind, fields_key, top_level)
+    return builder(obj)
@@ -1,58 +1,35 @@
 import os
 import asyncio
-from typing import Optional, Dict, Type
+from collections import deque, namedtuple
+from typing import Optional
 
+import orjson
 from fastapi import WebSocketDisconnect
 
 from opendevin.agent import Agent
 from opendevin.controller import AgentController
 
-from opendevin.action import (
-    Action,
-    CmdRunAction,
-    CmdKillAction,
-    BrowseURLAction,
-    FileReadAction,
-    FileWriteAction,
-    AgentRecallAction,
-    AgentThinkAction,
-    AgentFinishAction,
-)
+from opendevin.action import Action
 from opendevin.observation import (
     Observation,
     UserMessageObservation
 )
 
-# NOTE: this is a temporary solution - but hopefully we can use Action/Observation throughout the codebase
-ACTION_TYPE_TO_CLASS: Dict[str, Type[Action]] = {
-    "run": CmdRunAction,
-    "kill": CmdKillAction,
-    "browse": BrowseURLAction,
-    "read": FileReadAction,
-    "write": FileWriteAction,
-    "recall": AgentRecallAction,
-    "think": AgentThinkAction,
-    "finish": AgentFinishAction,
-}
 
+# Outgoing messages buffered per session before senders have to wait (or drop)
+SEND_QUEUE_SIZE = 1024
 
 DEFAULT_WORKSPACE_DIR = os.getenv("WORKSPACE_DIR", os.path.join(os.getcwd(), "workspace"))
 
-def parse_event(data):
-    if "action" not in data:
+Event = namedtuple("Event", ["action", "args", "message"])
+
+def parse_event(data) -> Optional[Event]:
+    if not isinstance(data, dict):
         return None
-    action = data["action"]
-    args = {}
-    if "args" in data:
-        args = data["args"]
-    message = None
-    if "message" in data:
-        message = data["message"]
-    return {
-        "action": action,
-        "args": args,
-        "message": message,
-    }
+    action = data.get("action")
+    if action is None:
+        return None
+    return Event(action, data.get("args") or {}, data.get("message"))
 
 class Session:
     def __init__(self, websocket):
@@ -60,6 +37,14 @@ class Session:
         self.controller: Optional[AgentController] = None
         self.agent: Optional[Agent] = None
         self.agent_task = None
+        # all outgoing messages are buffered here and sent by a single writer task:
+        # control messages are never dropped, so senders wait for a free slot,
+        # while agent events evict the oldest one once the client falls behind
+        self._control: deque[dict] = deque()
+        self._control_slots = asyncio.Semaphore(SEND_QUEUE_SIZE)
+        self._agent_events: deque[dict] = deque(maxlen=SEND_QUEUE_SIZE)
+        self._send_ready = asyncio.Event()
+        self._writer_task = asyncio.create_task(self._writer(), name="session writer")
         asyncio.create_task(self.create_controller(), name="create controller") # FIXME: starting the docker container synchronously causes a websocket error...
 
     async def send_error(self, message):
@@ -69,10 +54,36 @@ class Session:
         await self.send({"message": message})
 
     async def send(self, data):
+        if self.websocket is None:
+            return
+        # waits for a free slot, so a slow client slows its senders down
+        await self._control_slots.acquire()
+        if self.websocket is None:
+            # disconnected while waiting: pass the slot on so the next waiter wakes too
+            self._control_slots.release()
+            return
+        self._control.append(data)
+        self._send_ready.set()
+
+    async def _writer(self):
+        while True:
+            await self._send_ready.wait()
+            self._send_ready.clear()
+            # control messages go out ahead of any backlog of agent events
+            while self._control or self._agent_events:
+                if self._control:
+                    data = self._control.popleft()
+                    self._control_slots.release()
+                else:
+                    data = self._agent_events.popleft()
+                await self._send_now(data)
+
+    async def _send_now(self, data):
         if self.websocket is None:
             return
         try:
-            await self.websocket.send_json(data)
+            # send text frames: the frontend JSON.parse()s event.data
+            await self.websocket.send_text(orjson.dumps(data).decode())
         except Exception as e:
             print("Error sending data to client", e)
 
@@ -80,8 +91,8 @@ class Session:
         try:
             while True:
                 try:
-                    data = await self.websocket.receive_json()
-                except ValueError:
+                    data = orjson.loads(await self.websocket.receive_text())
+                except orjson.JSONDecodeError:
                     await self.send_error("Invalid JSON")
                     continue
 
@@ -89,16 +100,16 @@ class Session:
                 if event is None:
                     await self.send_error("Invalid event")
                     continue
-                if event["action"] == "initialize":
+                if event.action == "initialize":
                     await self.create_controller(event)
-                elif event["action"] == "start":
+                elif event.action == "start":
                     await self.start_task(event)
                 else:
                     if self.controller is None:
                         await self.send_error("No agent started. Please wait a second...")
 
-                    elif event["action"] == "chat":
-                        self.controller.add_observation(UserMessageObservation(event["message"]))
+                    elif event.action == "chat":
+                        self.controller.add_observation(UserMessageObservation(event.message))
                     else:
                         # TODO: we only need to implement user message for now
                         # since even Devin does not support having the user taking other
@@ -106,12 +117,17 @@ class Session:
                         raise NotImplementedError
 
         except WebSocketDisconnect as e:
+            print("Client websocket disconnected", e)
+        finally:
+            # tear down however the loop ended, so the writer and agent tasks don't leak
             self.websocket = None
+            self._writer_task.cancel()
+            # wake any sender waiting for a slot; each one passes it on in turn
+            self._control_slots.release()
             if self.agent_task:
                 self.agent_task.cancel()
-            print("Client websocket disconnected", e)
 
-    async def create_controller(self, start_event=None):
+    async def create_controller(self, start_event: Optional[Event] = None):
         directory = DEFAULT_WORKSPACE_DIR
         if start_event and "directory" in start_event.args:
             directory = start_event.args["directory"]
@@ -132,17 +148,23 @@ class Session:
         self.controller = AgentController(self.agent, directory, callbacks=[self.on_agent_event])
         await self.send({"action": "initialize", "message": "Control loop started."})
 
-    async def start_task(self, start_event):
-        if "task" not in start_event["args"]:
+    async def start_task(self, start_event: Event):
+        if "task" not in start_event.args:
             await self.send_error("No task specified")
             return
         await self.send_message("Starting new task...")
-        task = start_event["args"]["task"]
+        task = start_event.args["task"]
         if self.controller is None:
             await self.send_error("No agent started. Please wait a second...")
             return
         self.agent_task = asyncio.create_task(self.controller.start_loop(task), name="agent loop")
 
     def on_agent_event(self, event: Observation | Action):
-        event_dict = event.to_dict()
-        asyncio.create_task(self.send(event_dict), name="send event in callback")
+        if self.websocket is None:
+            return
+        # called synchronously from the agent loop, so it can't wait for room;
+        # the bounded deque drops the oldest agent event when the client falls behind
+        if len(self._agent_events) == SEND_QUEUE_SIZE:
+            print("Client falling behind, dropping oldest agent event")
+        self._agent_events.append(event.to_dict())
+        self._send_ready.set()